@@ -0,0 +1,77 @@
+"""
+Escape Sequence Unescaping for Letta Proxy
+
+Shared primitive used by both the stateful streaming processor and the
+non-streaming helpers to turn escaped sequences (\\n, \\t, \\r, \\\\, \\")
+emitted by Letta into their actual characters.
+"""
+
+import re
+
+
+# Supported escape sequences and their replacements
+ESCAPE_SEQUENCES = {
+    '\\n': '\n',    # newline
+    '\\t': '\t',    # tab
+    '\\r': '\r',    # carriage return
+    '\\\\': '\\',   # backslash
+    '\\"': '"',     # quote
+}
+
+# Matches any supported escape sequence; scanned left to right in one pass.
+# The capturing group makes split() return the escaped chars at the odd indices.
+_ESC_RE = re.compile(r'\\([ntr\\"])')
+
+# Maps an escaped char to its replacement; backslash and quote map to themselves
+_ESC_TRANS = str.maketrans({'n': '\n', 't': '\t', 'r': '\r'})
+
+# Below this size, or with at least one backslash per _DENSE_RATIO chars,
+# chained str.replace passes are cheaper than splitting on each escape
+_SHORT_CONTENT = 128
+_DENSE_RATIO = 32
+_SENTINEL = '\x00'
+
+
+def _unescape_all(content: str, backslashes: int) -> str:
+    """Replace every supported escape sequence without a per-match Python callback.
+
+    Short or escape-dense content goes through a fixed chain of C-level
+    str.replace passes; escaped backslashes are parked on a sentinel first so
+    escapes still pair left to right. Long, sparse content is split by the
+    regex instead, which only touches the escapes it finds; the captured
+    chars are decoded together by one str.translate call.
+
+    ``backslashes`` is ``content.count('\\\\')``, already computed by the caller.
+    """
+    size = len(content)
+    if (size <= _SHORT_CONTENT or size <= _DENSE_RATIO * backslashes) and _SENTINEL not in content:
+        return (content.replace('\\\\', _SENTINEL)
+                .replace('\\n', '\n')
+                .replace('\\t', '\t')
+                .replace('\\r', '\r')
+                .replace('\\"', '"')
+                .replace(_SENTINEL, '\\'))
+    parts = _ESC_RE.split(content)
+    parts[1::2] = ''.join(parts[1::2]).translate(_ESC_TRANS)
+    return ''.join(parts)
+
+
+def unescape(content: str) -> str:
+    """
+    Unescape all supported escape sequences in content.
+
+    Escapes are decoded left to right; unknown escapes are kept verbatim.
+
+    Args:
+        content: Content to unescape
+
+    Returns:
+        Content with escape sequences replaced
+    """
+    backslashes = content.count('\\')
+    if not backslashes:
+        return content
+    # Dominant shape (e.g. markdown tables): every backslash starts a \\n
+    if backslashes == content.count('\\n'):
+        return content.replace('\\n', '\n')
+    return _unescape_all(content, backslashes)
@@ -51,11 +51,16 @@ from streaming_models import (
     StreamingChunk,
     Delta,
     Choice,
-    create_streaming_chunk,
     create_error_chunk,
+    render_chunk,
     unescape_content
 )
-from streaming_content_processor import process_streaming_chunk, cleanup_streaming_session
+from streaming_content_processor import (
+    ChunkBatcher,
+    cleanup_streaming_session,
+    flush_streaming_session_buffer,
+    iter_with_flush_deadline,
+)
 
 # Load environment variables from .env file
 load_dotenv()
@@ -514,14 +519,14 @@ async def chat_completions(body: ChatCompletionRequest, request: Request) -> Any
                 ],
             }
             # Fix: Preserve actual newlines in primer message content
-            # Use Pydantic model for consistent JSON formatting
-            primer_chunk = create_streaming_chunk(
+            # Rendered with the same JSON layout as the Pydantic chunk model
+            primer_chunk = render_chunk(
                 stream_id=primer["id"],
                 model=primer["model"],
                 content="",
                 finish_reason=None
             )
-            yield f"data: {primer_chunk.model_dump_json()}\n\n"
+            yield f"data: {primer_chunk}\n\n"
             yield "data: [DONE]\n\n"
             # Cleanup session state for empty stream
             cleanup_streaming_session(session_id)
@@ -542,14 +547,27 @@ async def chat_completions(body: ChatCompletionRequest, request: Request) -> Any
 
         async def stream_chunks():
             """Convert Letta streaming events to string chunks like reference implementation"""
+            # Coalesces assistant text; flushed before any other chunk is sent
+            batcher = ChunkBatcher(session_id)
             try:
-                async for event in client.agents.messages.create_stream(
+                events = client.agents.messages.create_stream(
                     agent_id=agent_id,
                     messages=outbound_messages,
                     stream_tokens=True
-                ):
+                )
+                # Wakes up with None when batched text is due and upstream is quiet
+                async for event in iter_with_flush_deadline(events, batcher):
+                    if event is None:
+                        pending = batcher.flush()
+                        if pending:
+                            yield f"data: {render_chunk(resp_id, body.model, pending)}\n\n"
+                        continue
+
                     # Handle tool calls - preserve our tool functionality
                     if hasattr(event, 'message_type') and event.message_type == 'tool_call_message':
+                        pending = batcher.flush()
+                        if pending:
+                            yield f"data: {render_chunk(resp_id, body.model, pending)}\n\n"
                         chunk_resp = StreamingChunk(
                             id=resp_id,
                             object="chat.completion.chunk",
@@ -574,6 +592,9 @@ async def chat_completions(body: ChatCompletionRequest, request: Request) -> Any
                         yield f"data: {chunk_resp.model_dump_json()}\n\n"
                         continue
                     elif isinstance(event, ToolCallMessage):
+                        pending = batcher.flush()
+                        if pending:
+                            yield f"data: {render_chunk(resp_id, body.model, pending)}\n\n"
                         chunk_resp = StreamingChunk(
                             id=resp_id,
                             object="chat.completion.chunk",
@@ -606,26 +627,23 @@ async def chat_completions(body: ChatCompletionRequest, request: Request) -> Any
                             write_debug_output(f"RAW LETTA CONTENT: {repr(chunk_content)}", "LETTA_RAW")
                             write_debug_output(f"AFTER UNESCAPE: {repr(unescape_content(chunk_content))}", "AFTER_UNESCAPE")
                         # Use stateful processor for streaming-aware newline reconstruction
-                        chunk_content = process_streaming_chunk(session_id, chunk_content)
+                        chunk_content = batcher.add(chunk_content)
                     elif isinstance(event, AssistantMessage):
                         chunk_content = event.content or ""
                         if DEBUG_RAW_OUTPUT:
                             write_debug_output(f"RAW LETTA CONTENT (legacy): {repr(chunk_content)}", "LETTA_RAW_LEGACY")
                         # Use stateful processor for streaming-aware newline reconstruction
-                        chunk_content = process_streaming_chunk(session_id, chunk_content)
+                        chunk_content = batcher.add(chunk_content)
                     elif hasattr(event, 'message_type') and event.message_type == 'reasoning_message':
                         # Skip reasoning or include it - up to you
                         continue
                     elif hasattr(event, 'message_type') and event.message_type == 'stop_reason':
-                        # Send final chunk
-                        final_chunk = StreamingChunk(
-                            id=resp_id,
-                            object="chat.completion.chunk",
-                            created=int(time.time()),
-                            model=body.model,
-                            choices=[Choice(index=0, delta=Delta(content=""), finish_reason=event.stop_reason)]
-                        )
-                        yield f"data: {final_chunk.model_dump_json()}\n\n"
+                        # Send any batched text, then the final chunk
+                        pending = batcher.flush() + flush_streaming_session_buffer(session_id)
+                        if pending:
+                            yield f"data: {render_chunk(resp_id, body.model, pending)}\n\n"
+                        final_chunk = render_chunk(resp_id, body.model, "", event.stop_reason)
+                        yield f"data: {final_chunk}\n\n"
                         return
                     else:
                         continue
@@ -636,36 +654,25 @@ async def chat_completions(body: ChatCompletionRequest, request: Request) -> Any
                             logger.warning(f"Letta returned non-string chunk: {type(chunk_content)}. Converting to str.")
                             chunk_content = str(chunk_content)
 
-                        chunk_resp = StreamingChunk(
-                            id=resp_id,
-                            object="chat.completion.chunk",
-                            created=int(time.time()),
-                            model=body.model,
-                            choices=[Choice(index=0, delta=Delta(content=chunk_content))]
-                        )
-                        yield f"data: {chunk_resp.model_dump_json()}\n\n"
+                        chunk_resp = render_chunk(resp_id, body.model, chunk_content)
+                        yield f"data: {chunk_resp}\n\n"
 
-                # Send final chunk if not already sent
-                final_chunk = StreamingChunk(
-                    id=resp_id,
-                    object="chat.completion.chunk",
-                    created=int(time.time()),
-                    model=body.model,
-                    choices=[Choice(index=0, delta=Delta(content=""), finish_reason="stop")]
-                )
-                yield f"data: {final_chunk.model_dump_json()}\n\n"
+                # Send any batched text, then the final chunk if not already sent
+                pending = batcher.flush() + flush_streaming_session_buffer(session_id)
+                if pending:
+                    yield f"data: {render_chunk(resp_id, body.model, pending)}\n\n"
+                final_chunk = render_chunk(resp_id, body.model, "", "stop")
+                yield f"data: {final_chunk}\n\n"
                 
             except Exception as e:
                 logger.error(f"Error during streaming: {e}", exc_info=True)
+                # Text received before the failure still goes out ahead of the error
+                pending = batcher.flush() + flush_streaming_session_buffer(session_id)
+                if pending:
+                    yield f"data: {render_chunk(resp_id, body.model, pending)}\n\n"
                 error_chunk_content = f"Error processing stream: {e}"
-                error_resp = StreamingChunk(
-                    id=resp_id,
-                    object="chat.completion.chunk",
-                    created=int(time.time()),
-                    model=body.model,
-                    choices=[Choice(index=0, delta=Delta(content=error_chunk_content), finish_reason="stop")]
-                )
-                yield f"data: {error_resp.model_dump_json()}\n\n"
+                error_resp = render_chunk(resp_id, body.model, error_chunk_content, "stop")
+                yield f"data: {error_resp}\n\n"
 
         async def event_stream():
             assert client is not None
@@ -5,9 +5,13 @@ This module contains Pydantic models and utility functions for handling
 streaming responses in the Letta Proxy server.
 """
 
+from json.encoder import encode_basestring as _json_str
+from time import time as _now
 from typing import Optional, List, Dict
 from pydantic import BaseModel
 
+from _unescape import unescape
+
 
 class Delta(BaseModel):
     """Delta model for streaming response chunks."""
@@ -55,16 +59,20 @@ def create_streaming_chunk(stream_id: str, model: str, content: str = "", reason
 
     Returns:
         StreamingChunk: Properly structured streaming chunk
+
+    Note:
+        Models are built with ``model_construct`` and skip Pydantic validation.
+        Arguments are trusted, already-typed values produced by the proxy itself.
     """
-    return StreamingChunk(
+    return StreamingChunk.model_construct(
         id=stream_id,
         object="chat.completion.chunk",
-        created=int(__import__('time').time()),
+        created=int(_now()),
         model=model,
         choices=[
-            Choice(
+            Choice.model_construct(
                 index=0,
-                delta=Delta(content=content, reasoning=reasoning),
+                delta=Delta.model_construct(content=content, reasoning=reasoning, tool_calls=None),
                 logprobs=None,
                 finish_reason=finish_reason
             )
@@ -72,6 +80,39 @@ def create_streaming_chunk(stream_id: str, model: str, content: str = "", reason
     )
 
 
+# Serialized form of a content-only StreamingChunk, matching model_dump_json()
+_CHUNK_TEMPLATE = (
+    '{"id":%s,"object":"chat.completion.chunk","created":%d,"model":%s,'
+    '"choices":[{"index":0,"delta":{"content":%s,"reasoning":null,"tool_calls":null},'
+    '"logprobs":null,"finish_reason":%s}]}'
+)
+
+
+def render_chunk(stream_id: str, model: str, content: str = "", finish_reason: Optional[str] = None) -> str:
+    """Render a content-only streaming chunk directly to JSON.
+
+    Produces the same JSON as ``create_streaming_chunk(...).model_dump_json()``
+    without building or serializing Pydantic models. Use it wherever a chunk is
+    serialized immediately after being created.
+
+    Args:
+        stream_id: Unique identifier for the streaming session
+        model: Model/agent name being used
+        content: Content to include in the chunk
+        finish_reason: Optional finish reason (e.g., "stop", "end_turn")
+
+    Returns:
+        str: JSON-encoded streaming chunk
+    """
+    return _CHUNK_TEMPLATE % (
+        _json_str(stream_id),
+        int(_now()),
+        _json_str(model),
+        _json_str(content),
+        "null" if finish_reason is None else _json_str(finish_reason),
+    )
+
+
 def create_error_chunk(stream_id: str, model: str, error_message: str) -> StreamingChunk:
     """Create an error chunk for streaming responses.
 
@@ -82,16 +123,19 @@ def create_error_chunk(stream_id: str, model: str, error_message: str) -> Stream
 
     Returns:
         StreamingChunk: Error chunk with stop finish_reason
+
+    Note:
+        Built with ``model_construct`` (no validation), like create_streaming_chunk.
     """
-    return StreamingChunk(
+    return StreamingChunk.model_construct(
         id=stream_id,
         object="chat.completion.chunk",
-        created=int(__import__('time').time()),
+        created=int(_now()),
         model=model,
         choices=[
-            Choice(
+            Choice.model_construct(
                 index=0,
-                delta=Delta(content=f"Error processing stream: {error_message}", reasoning=None),
+                delta=Delta.model_construct(content=f"Error processing stream: {error_message}", reasoning=None, tool_calls=None),
                 logprobs=None,
                 finish_reason="stop"
             )
@@ -113,13 +157,4 @@ def unescape_content(content: str) -> str:
 
     # Conservative approach: only replace clear escape sequences
     # Don't try to JSON-decode as it can break valid JSON structure
-    result = content
-
-    # Handle common escape sequences one by one
-    result = result.replace("\\n", "\n")      # \\n -> newline
-    result = result.replace("\\t", "\t")      # \\t -> tab
-    result = result.replace("\\r", "\r")      # \\r -> carriage return
-    result = result.replace("\\\\", "\\")     # \\\\ -> backslash
-    result = result.replace('\\"', '"')       # \\" -> quote
-
-    return result
\ No newline at end of file
+    return unescape(content)
@@ -0,0 +1,36 @@
+"""
+JSON helpers shared by the test scripts.
+
+Prefers orjson, then ujson, then the stdlib json module. All tiers expose the
+same interface: ``loads`` (str, bytes or memoryview), ``dumps`` (str, with an
+optional ``indent``), ``dumpb`` (bytes) and ``JSONDecodeError``.
+"""
+
+try:
+    import orjson
+
+    JSONDecodeError = orjson.JSONDecodeError
+    loads = orjson.loads
+    dumpb = orjson.dumps
+
+    def dumps(o, indent=None):
+        return orjson.dumps(o, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+except ImportError:
+    try:
+        import ujson as _impl
+
+        JSONDecodeError = getattr(_impl, "JSONDecodeError", ValueError)
+    except ImportError:
+        import json as _impl
+
+        JSONDecodeError = _impl.JSONDecodeError
+
+    def loads(s):
+        # Unlike orjson, these don't take buffer objects
+        return _impl.loads(s.tobytes() if isinstance(s, memoryview) else s)
+
+    def dumps(o, indent=None):
+        return _impl.dumps(o, indent=indent) if indent else _impl.dumps(o)
+
+    def dumpb(o):
+        return dumps(o).encode()
@@ -6,11 +6,11 @@ This script demonstrates that the fix correctly handles newline characters
 in streaming content for proper markdown rendering.
 """
 
-import json
 from streaming_models import (
     create_streaming_chunk,
     unescape_content
 )
+from tests._json_compat import loads
 
 
 def test_newline_handling():
@@ -35,7 +35,7 @@ def test_newline_handling():
     print(f"JSON serialized: {json_str}")
 
     # Step 4: Parse back to verify newlines are preserved
-    parsed = json.loads(json_str)
+    parsed = loads(json_str)
     content = parsed["choices"][0]["delta"]["content"]
     print(f"Parsed content: {repr(content)}")
 
@@ -2,55 +2,115 @@
 """
 Test script to verify Ollama endpoints are working on port 11433
 """
-import json
-import requests
+import asyncio
+import importlib.util
 import sys
+from operator import itemgetter
 
-def test_ollama_models_endpoint():
+import httpx
+import pytest
+import pytest_asyncio
+
+try:
+    from tests._json_compat import dumps, loads
+except ModuleNotFoundError:  # run directly as a script from tests/
+    from _json_compat import dumps, loads
+
+pytestmark = pytest.mark.asyncio
+
+# HTTP/2 lets concurrent probes share one connection; needs the optional h2 package
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_get_choices = itemgetter('choices')
+
+
+def make_client() -> httpx.AsyncClient:
+    """Create the pooled client shared by all probes"""
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        timeout=30,
+        headers={"Content-Type": "application/json"},
+        limits=httpx.Limits(max_keepalive_connections=8),
+    )
+
+
+@pytest_asyncio.fixture
+async def client():
+    """Pooled client for running the probes under pytest; skips if Ollama is down"""
+    async with make_client() as c:
+        try:
+            await c.get("http://localhost:11433/", timeout=2)
+        except httpx.TransportError as e:
+            pytest.skip(f"Ollama not reachable on port 11433: {e}")
+        yield c
+
+
+async def _probe(client: httpx.AsyncClient, method: str, url: str, **kw) -> tuple[int, dict | None, str]:
+    """Send one request; returns (status, decoded JSON body, body text) or (-1, {'error': ...}, "") on failure
+
+    The body text is kept for error output, since plain-text error bodies decode to None.
+    """
+    try:
+        response = await client.request(method, url, **kw)
+        is_json = response.headers.get("content-type", "").startswith("application/json")
+        data = loads(response.content) if is_json and response.content else None
+        return response.status_code, data, response.text
+    except Exception as e:
+        return -1, {"error": str(e)}, ""
+
+
+# Successful /api/tags results by URL; the model list rarely changes within a run
+_TAGS_CACHE: dict[str, tuple[int, dict | None, str]] = {}
+
+
+async def _fetch_tags(client: httpx.AsyncClient, url: str) -> tuple[int, dict | None, str]:
+    """Probe the tags endpoint once per process; failures are retried on the next call"""
+    if url not in _TAGS_CACHE:
+        result = await _probe(client, "GET", url, timeout=10)
+        if result[0] != 200:
+            return result
+        _TAGS_CACHE[url] = result
+    return _TAGS_CACHE[url]
+
+
+async def probe_ollama_models_endpoint(client: httpx.AsyncClient):
     """Test the models endpoint"""
     print("🧪 Testing Ollama models endpoint on port 11433...")
 
     url = "http://localhost:11433/api/tags"
-    headers = {"Content-Type": "application/json"}
 
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-
-        if response.status_code == 200:
-            models_data = response.json()
-            print("✅ Models endpoint is working!"            print(f"📋 Status: {response.status_code}")
-
-            if 'models' in models_data:
-                models = models_data['models']
-                print(f"🔍 Found {len(models)} models:")
-                for model in models:
-                    name = model.get('name', 'Unknown')
-                    size = model.get('size', 0)
-                    modified = model.get('modified_at', 'Unknown')
-                    print(f"   • {name} ({size} bytes, modified: {modified})")
-            else:
-                print("⚠️  No 'models' key in response")
-                print(f"Response: {json.dumps(models_data, indent=2)}")
+    code, models_data, body_text = await _fetch_tags(client, url)
+
+    if code == 200 and models_data is not None:
+        print("✅ Models endpoint is working!")
+        print(f"📋 Status: {code}")
 
-            return True
+        if 'models' in models_data:
+            models = models_data['models']
+            print(f"🔍 Found {len(models)} models:")
+            for model in models:
+                name = model.get('name', 'Unknown')
+                size = model.get('size', 0)
+                modified = model.get('modified_at', 'Unknown')
+                print(f"   • {name} ({size} bytes, modified: {modified})")
         else:
-            print(f"❌ Models endpoint failed with status {response.status_code}")
-            print(f"Response: {response.text}")
-            return False
+            print("⚠️  No 'models' key in response")
+            print(f"Response: {dumps(models_data, indent=2)}")
 
-    except requests.RequestException as e:
-        print(f"❌ Models endpoint request error: {e}")
+        return True
+    elif code == -1:
+        print(f"❌ Models endpoint request error: {models_data['error']}")
         return False
-    except json.JSONDecodeError as e:
-        print(f"❌ Invalid JSON response from models endpoint: {e}")
+    else:
+        print(f"❌ Models endpoint failed with status {code}")
+        print(f"Response: {body_text}")
         return False
 
-def test_ollama_openai_endpoint():
+async def probe_ollama_openai_endpoint(client: httpx.AsyncClient):
     """Test the OpenAI compatible endpoint"""
     print("\n🧪 Testing Ollama OpenAI compatible endpoint on port 11433...")
 
     url = "http://localhost:11433/v1/chat/completions"
-    headers = {"Content-Type": "application/json"}
 
     # Simple test request
     data = {
@@ -62,56 +122,49 @@ def test_ollama_openai_endpoint():
         "stream": False
     }
 
-    try:
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-
-        if response.status_code == 200:
-            response_data = response.json()
-            print("✅ OpenAI compatible endpoint is working!"            print(f"📋 Status: {response.status_code}")
-
-            if 'choices' in response_data and len(response_data['choices']) > 0:
-                message = response_data['choices'][0]['message']['content']
-                print(f"🤖 Response: {message}")
-
-                # Check if we got a reasonable response
-                if 'working' in message.lower() or len(message) > 0:
-                    print("✅ Got valid response content")
-                    return True
-                else:
-                    print("⚠️  Got empty or unexpected response")
-                    return False
+    code, response_data, body_text = await _probe(client, "POST", url, json=data)
+
+    if code == 200 and response_data is not None:
+        print("✅ OpenAI compatible endpoint is working!")
+        print(f"📋 Status: {code}")
+
+        if 'choices' in response_data and (choices := _get_choices(response_data)):
+            message = choices[0]['message']['content']
+            print(f"🤖 Response: {message}")
+
+            # Check if we got a reasonable response
+            if 'working' in message.lower() or len(message) > 0:
+                print("✅ Got valid response content")
+                return True
             else:
-                print("⚠️  No choices in response")
-                print(f"Response: {json.dumps(response_data, indent=2)}")
+                print("⚠️  Got empty or unexpected response")
                 return False
-
-        elif response.status_code == 404:
-            print("❌ OpenAI compatible endpoint not found (404)")
-            print("This might mean the OpenAI compatibility mode isn't enabled")
-            return False
-        elif response.status_code == 400:
-            error_data = response.json()
-            print("❌ Bad request (400) - possibly model not found")
-            print(f"Error: {error_data.get('error', {}).get('message', 'Unknown error')}")
-            return False
         else:
-            print(f"❌ OpenAI endpoint failed with status {response.status_code}")
-            print(f"Response: {response.text}")
+            print("⚠️  No choices in response")
+            print(f"Response: {dumps(response_data, indent=2)}")
             return False
 
-    except requests.RequestException as e:
-        print(f"❌ OpenAI endpoint request error: {e}")
+    elif code == -1:
+        print(f"❌ OpenAI endpoint request error: {response_data['error']}")
+        return False
+    elif code == 404:
+        print("❌ OpenAI compatible endpoint not found (404)")
+        print("This might mean the OpenAI compatibility mode isn't enabled")
+        return False
+    elif code == 400:
+        print("❌ Bad request (400) - possibly model not found")
+        print(f"Error: {(response_data or {}).get('error', {}).get('message', 'Unknown error')}")
         return False
-    except json.JSONDecodeError as e:
-        print(f"❌ Invalid JSON response from OpenAI endpoint: {e}")
+    else:
+        print(f"❌ OpenAI endpoint failed with status {code}")
+        print(f"Response: {body_text}")
         return False
 
-def test_ollama_generate_endpoint():
+async def probe_ollama_generate_endpoint(client: httpx.AsyncClient):
     """Test the basic generate endpoint as a fallback"""
     print("\n🧪 Testing Ollama generate endpoint (fallback test)...")
 
     url = "http://localhost:11433/api/generate"
-    headers = {"Content-Type": "application/json"}
 
     data = {
         "model": "llama2",
@@ -119,52 +172,60 @@ def test_ollama_generate_endpoint():
         "stream": False
     }
 
-    try:
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-
-        if response.status_code == 200:
-            response_data = response.json()
-            print("✅ Generate endpoint is working!"            print(f"📋 Status: {response.status_code}")
-
-            if 'response' in response_data:
-                message = response_data['response']
-                print(f"🤖 Response: {message}")
-
-                if 'working' in message.lower() or len(message) > 0:
-                    print("✅ Got valid response content")
-                    return True
-                else:
-                    print("⚠️  Got empty or unexpected response")
-                    return False
+    code, response_data, _ = await _probe(client, "POST", url, json=data)
+
+    if code == 200 and response_data is not None:
+        print("✅ Generate endpoint is working!")
+        print(f"📋 Status: {code}")
+
+        if 'response' in response_data:
+            message = response_data['response']
+            print(f"🤖 Response: {message}")
+
+            if 'working' in message.lower() or len(message) > 0:
+                print("✅ Got valid response content")
+                return True
             else:
-                print("⚠️  No 'response' key in generate response")
+                print("⚠️  Got empty or unexpected response")
                 return False
-
         else:
-            print(f"❌ Generate endpoint failed with status {response.status_code}")
+            print("⚠️  No 'response' key in generate response")
             return False
 
-    except requests.RequestException as e:
-        print(f"❌ Generate endpoint request error: {e}")
+    elif code == -1:
+        print(f"❌ Generate endpoint request error: {response_data['error']}")
         return False
-    except json.JSONDecodeError as e:
-        print(f"❌ Invalid JSON response from generate endpoint: {e}")
+    else:
+        print(f"❌ Generate endpoint failed with status {code}")
         return False
 
-def main():
+async def test_ollama_models_endpoint(client: httpx.AsyncClient):
+    assert await probe_ollama_models_endpoint(client)
+
+
+async def test_ollama_openai_endpoint(client: httpx.AsyncClient):
+    assert await probe_ollama_openai_endpoint(client)
+
+
+async def test_ollama_generate_endpoint(client: httpx.AsyncClient):
+    assert await probe_ollama_generate_endpoint(client)
+
+
+async def main():
     """Run all tests"""
     print("🚀 Starting Ollama endpoint tests on port 11433\n")
 
-    # Test models endpoint first
-    models_ok = test_ollama_models_endpoint()
-
-    # Test OpenAI compatible endpoint
-    openai_ok = test_ollama_openai_endpoint()
+    async with make_client() as client:
+        # Models and OpenAI compatible endpoints are independent; probe both at once
+        models_ok, openai_ok = await asyncio.gather(
+            probe_ollama_models_endpoint(client),
+            probe_ollama_openai_endpoint(client),
+        )
 
-    # If OpenAI endpoint fails, try the basic generate endpoint
-    generate_ok = False
-    if not openai_ok:
-        generate_ok = test_ollama_generate_endpoint()
+        # If OpenAI endpoint fails, try the basic generate endpoint
+        generate_ok = False
+        if not openai_ok:
+            generate_ok = await probe_ollama_generate_endpoint(client)
 
     # Summary
     print("\n" + "="*50)
@@ -181,5 +242,5 @@ def main():
         return False
 
 if __name__ == "__main__":
-    success = main()
+    success = asyncio.run(main())
     sys.exit(0 if success else 1)
\ No newline at end of file
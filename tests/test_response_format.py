@@ -1,6 +1,17 @@
 #!/usr/bin/env python3
+import sys
 
-import json
+try:
+    from tests._json_compat import dumpb
+except ModuleNotFoundError:  # run directly as a script from tests/
+    from _json_compat import dumpb
+
+
+def write_frame(payload: bytes) -> None:
+    """Write one pre-serialized SSE data frame as raw bytes"""
+    sys.stdout.flush()  # keep ordering with earlier print() output
+    sys.stdout.buffer.write(b"data: " + payload + b"\n")
+    sys.stdout.buffer.flush()
 
 # Simulate our current response format
 our_streaming_chunk = {
@@ -19,9 +30,10 @@ our_streaming_chunk = {
         }
     ],
 }
+_OUR_CHUNK_JSON = dumpb(our_streaming_chunk)
 
 print("=== OUR STREAMING CHUNK ===")
-print(f"data: {json.dumps(our_streaming_chunk, ensure_ascii=False)}")
+write_frame(_OUR_CHUNK_JSON)
 print()
 
 # Standard OpenAI response (what Ollama might be mimicking)
@@ -40,9 +52,10 @@ standard_chunk = {
         }
     ],
 }
+_STANDARD_CHUNK_JSON = dumpb(standard_chunk)
 
 print("=== STANDARD OPENAI CHUNK ===")
-print(f"data: {json.dumps(standard_chunk, ensure_ascii=False)}")
+write_frame(_STANDARD_CHUNK_JSON)
 print()
 
 # Check if there are differences in JSON serialization
@@ -0,0 +1,22 @@
+import pytest
+
+import streaming_models
+from streaming_models import create_streaming_chunk, render_chunk
+
+
+@pytest.mark.parametrize(
+    "content, finish_reason",
+    [
+        ("", None),
+        ("| A | B |\n|---|---|\n", None),
+        ('quote " backslash \\ tab \t ctrl \x01 unicode é 🚀', None),
+        ("", "stop"),
+    ],
+)
+def test_render_chunk_matches_model_dump(monkeypatch, content, finish_reason):
+    monkeypatch.setattr(streaming_models, "_now", lambda: 1700000000.0)
+
+    rendered = render_chunk("chatcmpl-test", "Milo", content, finish_reason)
+    chunk = create_streaming_chunk("chatcmpl-test", "Milo", content, finish_reason=finish_reason)
+
+    assert rendered == chunk.model_dump_json()
@@ -1,243 +1,141 @@
-#!/usr/bin/env python3
 """
-Test script for the Stateful Content Processor streaming functionality.
+Tests for the Stateful Content Processor streaming functionality.
 
-This script demonstrates and tests the streaming-aware escape sequence 
-reconstruction logic for handling split sequences across chunk boundaries.
+Covers the streaming-aware escape sequence reconstruction logic for
+handling split sequences across chunk boundaries.
 """
 
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import asyncio
 
+import pytest
+
+import streaming_content_processor
 from streaming_content_processor import (
+    ChunkBatcher,
     StatefulContentProcessor,
     process_streaming_chunk,
     cleanup_streaming_session,
-    flush_streaming_session_buffer
+    flush_streaming_session_buffer,
+    iter_with_flush_deadline
 )
 
 
-def test_basic_reconstruction():
-    """Test basic escape sequence reconstruction across chunks."""
-    print("=== Basic Reconstruction Test ===")
-    
-    processor = StatefulContentProcessor()
-    session_id = "test-basic"
-    
-    # Simulate chunks that split a \\n sequence
-    chunk1 = "Hello |\\"
-    chunk2 = "n World"
-    
-    print(f"Chunk 1: {repr(chunk1)}")
-    print(f"Chunk 2: {repr(chunk2)}")
-    
-    result1 = processor.process_chunk(session_id, chunk1)
-    result2 = processor.process_chunk(session_id, chunk2)
-    
-    print(f"Result 1: {repr(result1)}")
-    print(f"Result 2: {repr(result2)}")
-    
-    # Combined result should have actual newline
-    combined = result1 + result2
-    print(f"Combined: {repr(combined)}")
-    
-    expected = "Hello |\n World"
-    success = combined == expected
-    print(f"Expected: {repr(expected)}")
-    print(f"✅ PASS" if success else f"❌ FAIL")
-    print()
-    
-    return success
-
-
-def test_multiple_sequences():
-    """Test multiple escape sequences in one chunk."""
-    print("=== Multiple Sequences Test ===")
-    
-    processor = StatefulContentProcessor()
-    session_id = "test-multiple"
-    
-    # Chunk with multiple escape sequences
-    chunk = "Line 1\\nLine 2\\tTab\\nLine 3"
-    
-    print(f"Input: {repr(chunk)}")
-    
-    result = processor.process_chunk(session_id, chunk)
-    
-    print(f"Result: {repr(result)}")
-    
-    expected = "Line 1\nLine 2\tTab\nLine 3"
-    success = result == expected
-    print(f"Expected: {repr(expected)}")
-    print(f"✅ PASS" if success else f"❌ FAIL")
-    print()
-    
-    return success
-
-
-def test_split_multiple_sequences():
-    """Test multiple sequences split across multiple chunks."""
-    print("=== Split Multiple Sequences Test ===")
-    
-    processor = StatefulContentProcessor()
-    session_id = "test-split-multi"
-    
-    # Simulate complex splitting
-    chunks = [
-        "Start\\",
-        "nMiddle\\t",
-        "End\\",
-        "rDone"
-    ]
-    
-    print("Processing chunks:")
-    results = []
-    for i, chunk in enumerate(chunks):
-        print(f"  Chunk {i+1}: {repr(chunk)}")
-        result = processor.process_chunk(session_id, chunk)
-        results.append(result)
-        print(f"    Result: {repr(result)}")
-    
-    # Combined result
-    combined = "".join(results)
-    print(f"Combined: {repr(combined)}")
-    
-    expected = "Start\nMiddle\tEnd\rDone"
-    success = combined == expected
-    print(f"Expected: {repr(expected)}")
-    print(f"✅ PASS" if success else f"❌ FAIL")
-    print()
-    
-    return success
-
-
-def test_fast_path():
-    """Test fast path for content with real newlines."""
-    print("=== Fast Path Test ===")
-    
-    processor = StatefulContentProcessor()
-    session_id = "test-fast"
-    
-    # Content with real newlines (should use fast path)
-    chunk = "Line 1\nLine 2\nLine 3"
-    
-    print(f"Input: {repr(chunk)}")
-    
-    result = processor.process_chunk(session_id, chunk)
-    
-    print(f"Result: {repr(result)}")
-    
-    success = result == chunk  # Should be unchanged
-    print(f"✅ PASS (fast path)" if success else f"❌ FAIL")
-    print()
-    
-    return success
-
-
-def test_buffer_flush():
-    """Test buffer flushing at end of stream."""
-    print("=== Buffer Flush Test ===")
-    
+@pytest.fixture(scope="module")
+def processor():
+    # Shared across tests; each test keys its own session and drops it after
+    return StatefulContentProcessor()
+
+
+@pytest.mark.parametrize(
+    "chunks, expected",
+    [
+        # Basic reconstruction of a \\n split across chunks
+        (["Hello |\\", "n World"], "Hello |\n World"),
+        # Multiple escape sequences in one chunk
+        (["Line 1\\nLine 2\\tTab\\nLine 3"], "Line 1\nLine 2\tTab\nLine 3"),
+        # Multiple sequences split across multiple chunks
+        (["Start\\", "nMiddle\\t", "End\\", "rDone"], "Start\nMiddle\tEnd\rDone"),
+        # "\\\\" is a complete escaped backslash, the third "\\" starts a \\n
+        (["Path\\\\\\", "nNext", "Done\\\\"], "Path\\\nNextDone\\"),
+        # Real newlines take the fast path unchanged
+        (["Line 1\nLine 2\nLine 3"], "Line 1\nLine 2\nLine 3"),
+        # \\\\ followed by n is a literal backslash and an 'n', not a newline
+        (["C:\\\\new\\tdir\\q"], "C:\\new\tdir\\q"),
+        # Incomplete trailing sequence is returned as-is by the flush
+        (["Hello \\"], "Hello \\"),
+        # Long, sparse content takes the regex split path; \\q is kept verbatim
+        (
+            ["x" * 150 + "\\\\n" + "y" * 50 + '\\"' + "z" * 50 + "\\q" + "w" * 50 + "\\n"],
+            "x" * 150 + "\\n" + "y" * 50 + '"' + "z" * 50 + "\\q" + "w" * 50 + "\n",
+        ),
+        # A NUL in the content rules out the sentinel-based replace chain
+        (["a\x00\\tb\\\\n"], "a\x00\tb\\n"),
+        # Long chunk ending in an odd backslash run: the last one waits for 'n'
+        (["p" * 200 + "\\\\\\", "nq"], "p" * 200 + "\\\nq"),
+    ],
+)
+def test_reconstruction(processor, chunks, expected):
+    session_id = "test-reconstruction"
+
+    out = "".join(processor.process_chunk(session_id, chunk) for chunk in chunks)
+    out += processor.flush_session_buffer(session_id)
+    processor.cleanup_session(session_id)
+
+    assert out == expected
+
+
+def test_session_eviction():
+    # Own instance: shrinks the session cap and inspects every live session
     processor = StatefulContentProcessor()
-    session_id = "test-flush"
-    
-    # Chunk ending with incomplete sequence
-    chunk = "Hello \\"
-    
-    print(f"Chunk: {repr(chunk)}")
-    
-    result = processor.process_chunk(session_id, chunk)
-    print(f"Result: {repr(result)}")
-    
-    # Flush the buffer
-    flushed = processor.flush_session_buffer(session_id)
-    print(f"Flushed: {repr(flushed)}")
-    
-    # Combined should be "Hello \\" (no change since incomplete)
-    combined = result + flushed
-    expected = "Hello \\"
-    success = combined == expected
-    print(f"Expected: {repr(expected)}")
-    print(f"✅ PASS" if success else f"❌ FAIL")
-    print()
-    
-    return success
+    processor.MAX_SESSIONS = 2
+
+    processor.process_chunk("test-evict-1", "a")
+    processor.process_chunk("test-evict-2", "b")
+    processor.process_chunk("test-evict-1", "c")  # touch: session 2 is now oldest
+    processor.process_chunk("test-evict-3", "d")
+
+    assert sorted(processor._session_states) == ["test-evict-1", "test-evict-3"]
+
+    # Flushing an unknown session neither creates it nor evicts a live one
+    assert processor.flush_session_buffer("test-evict-4") == ""
+    assert sorted(processor._session_states) == ["test-evict-1", "test-evict-3"]
 
 
 def test_convenience_functions():
-    """Test the convenience functions."""
-    print("=== Convenience Functions Test ===")
-    
     session_id = "test-convenience"
-    
-    # Test process_streaming_chunk function
-    chunk1 = "Hello |\\"
-    chunk2 = "n World"
-    
-    print(f"Chunk 1: {repr(chunk1)}")
-    print(f"Chunk 2: {repr(chunk2)}")
-    
-    result1 = process_streaming_chunk(session_id, chunk1)
-    result2 = process_streaming_chunk(session_id, chunk2)
-    
-    print(f"Result 1: {repr(result1)}")
-    print(f"Result 2: {repr(result2)}")
-    
-    # Flush remaining buffer
+
+    result1 = process_streaming_chunk(session_id, "Hello |\\")
+    result2 = process_streaming_chunk(session_id, "n World")
     flushed = flush_streaming_session_buffer(session_id)
-    print(f"Flushed: {repr(flushed)}")
-    
-    combined = result1 + result2 + flushed
-    expected = "Hello |\n World"
-    success = combined == expected
-    print(f"Expected: {repr(expected)}")
-    print(f"✅ PASS" if success else f"❌ FAIL")
-    print()
-    
-    # Cleanup
     cleanup_streaming_session(session_id)
-    
-    return success
-
-
-def main():
-    """Run all tests."""
-    print("🚀 Testing Stateful Content Processor")
-    print("=" * 50)
-    print()
-    
-    tests = [
-        test_basic_reconstruction,
-        test_multiple_sequences,
-        test_split_multiple_sequences,
-        test_fast_path,
-        test_buffer_flush,
-        test_convenience_functions,
-    ]
-    
-    results = []
-    for test_func in tests:
-        try:
-            result = test_func()
-            results.append(result)
-        except Exception as e:
-            print(f"❌ Test {test_func.__name__} failed with exception: {e}")
-            results.append(False)
-        print()
-    
-    print("=" * 50)
-    passed = sum(results)
-    total = len(results)
-    print(f"📊 Results: {passed}/{total} tests passed")
-    
-    if passed == total:
-        print("🎉 All tests passed!")
-        return 0
-    else:
-        print("⚠️  Some tests failed!")
-        return 1
-
-
-if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+
+    assert result1 + result2 + flushed == "Hello |\n World"
+
+
+def test_chunk_batcher(monkeypatch):
+    # A clock reading below FLUSH_INTERVAL (e.g. a freshly booted host) must
+    # still let the first chunk out immediately
+    monkeypatch.setattr(streaming_content_processor, "_monotonic", lambda: 30.0)
+    session_id = "test-batcher"
+    batcher = ChunkBatcher(session_id)
+    batcher.FLUSH_INTERVAL = 60.0
+
+    emitted = [batcher.add(chunk) for chunk in ["Hello", " |\\", "n World"]]
+    flushed = batcher.flush()
+    cleanup_streaming_session(session_id)
+
+    # First chunk goes out immediately, the burst is held until flush()
+    assert emitted == ["Hello", "", ""]
+    assert flushed == " |\n World"
+
+
+@pytest.mark.asyncio
+async def test_flush_deadline(monkeypatch):
+    # Frozen clock: both chunks land in the same batch however slow the host,
+    # and only the real asyncio.wait timeout decides when the flush fires
+    monkeypatch.setattr(streaming_content_processor, "_monotonic", lambda: 100.0)
+    session_id = "test-deadline"
+    batcher = ChunkBatcher(session_id)
+    resume = asyncio.Event()
+
+    async def events():
+        yield "Hello"
+        yield " world"
+        await resume.wait()  # upstream stays quiet until the held text goes out
+        yield "!"
+
+    async def consume():
+        out = []
+        async for event in iter_with_flush_deadline(events(), batcher):
+            if event is None:
+                out.append(batcher.flush())
+                resume.set()
+            else:
+                out.append(batcher.add(event))
+        out.append(batcher.flush())
+        return out
+
+    out = await asyncio.wait_for(consume(), timeout=5)
+    cleanup_streaming_session(session_id)
+
+    assert out == ["Hello", "", " world", "", "!"]